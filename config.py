@@ -18,9 +18,10 @@ from pathlib import Path
 
 # --- Rutas Principales del Proyecto ---
 
-# Path.cwd() obtiene el directorio de trabajo actual donde se ejecuta el script.
-# Esto hace que el proyecto sea portable.
-RUTA_BASE_PROYECTO = Path.cwd()
+# Usamos el directorio donde se encuentra este archivo, resuelto una sola vez
+# al importar. Así las rutas no dependen del directorio desde el que se ejecute
+# el script, y el proyecto sigue siendo portable.
+RUTA_BASE_PROYECTO = Path(__file__).resolve().parent
 
 # Definimos las subcarpetas principales usando el operador '/', que pathlib
 # sobrecarga para unir rutas de forma segura.
@@ -33,14 +34,29 @@ RUTA_DATASET = RUTA_BASE_PROYECTO / "images" / "dataset"
 # Esto nos permitirá crear la estructura de forma programática.
 CARPETAS_DATASET = ["Train", "Test", "Validation"]
 
+# Ruta de cada carpeta del dataset, calculada una sola vez para no reconstruirla
+# en cada registro o modificación de una imagen.
+RUTAS_CONJUNTOS = {carpeta: RUTA_DATASET / carpeta for carpeta in CARPETAS_DATASET}
+
 # --- Configuración de Metadatos ---
 
-# Nombre del archivo que almacenará la metadata.
+# Nombre del archivo CSV donde versiones anteriores almacenaban la metadata.
 NOMBRE_METADATA_CSV = "metadata.csv"
 
-# Ruta completa y nombre del archivo CSV.
+# Ruta completa del CSV de versiones anteriores. Solo se lee una vez, para
+# importar sus registros la primera vez que se crea la base de datos.
 RUTA_METADATA_CSV = RUTA_DATA / NOMBRE_METADATA_CSV
 
+# Ruta del CSV que genera el botón "Exportar CSV". Es distinta de la del CSV
+# anterior, para que una exportación nunca se confunda con datos a importar.
+NOMBRE_EXPORTACION_CSV = "metadata_exportada.csv"
+RUTA_EXPORTACION_CSV = RUTA_DATA / NOMBRE_EXPORTACION_CSV
+
+# Base de datos SQLite donde se almacena la metadata. Permite actualizar o
+# eliminar un registro sin reescribir todos los demás.
+NOMBRE_METADATA_DB = "metadata.db"
+RUTA_METADATA_DB = RUTA_DATA / NOMBRE_METADATA_DB
+
 # Cabeceras que tendrá nuestro archivo CSV. Es crucial definirlas aquí
 # para asegurar consistencia al leer y escribir el archivo.
 CABECERAS_CSV = [
@@ -54,4 +70,21 @@ CABECERAS_CSV = [
     "Fovea_Y",
     "Size_X",
     "Size_Y"
-]
\ No newline at end of file
+]
+
+# Tamaño (en bytes) del buffer de lectura usado al recorrer el CSV de metadatos.
+TAMANO_BUFFER_LECTURA = 1 << 20
+
+# --- Configuración de la Interfaz Gráfica ---
+
+# Formatos de imagen (nombres de Pillow) que la aplicación intenta abrir. Son
+# los que ofrece el diálogo de selección de archivos.
+FORMATOS_IMAGEN = ("PNG", "JPEG", "BMP", "GIF")
+
+# Cantidad máxima de píxeles de una imagen antes de que Pillow la considere
+# sospechosa. Por encima del doble de este valor se rechaza sin decodificarla.
+MAX_PIXELES_IMAGEN = 50_000_000
+
+# Cantidad de filas que se cargan en la tabla de imágenes de una sola vez. Las
+# siguientes se cargan por páginas al desplazarse hacia el final de la tabla.
+TAMANO_PAGINA_TABLA = 200
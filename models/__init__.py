@@ -1,3 +1,4 @@
+from .db import BaseDatosMetadata
 from .gestor import GestorImagenes
 from .interfaz_grafica import AplicacionGUI
 from .imagen import Imagen
\ No newline at end of file
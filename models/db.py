@@ -0,0 +1,174 @@
+"""
+Módulo de Persistencia para el Proyecto de Glaucoma.
+
+Define la clase `BaseDatosMetadata`, que almacena la metadata de las imágenes
+en una base de datos SQLite. A diferencia de un archivo CSV, que debe
+reescribirse completo ante cada cambio, SQLite permite insertar, actualizar o
+eliminar un único registro a través de un índice.
+
+Principios de Diseño Aplicados:
+- **Separación de Responsabilidades (SoC)**: Encapsula todo el SQL; el gestor
+    solo trabaja con tuplas en el orden de `config.CABECERAS_CSV`.
+- **Consultas Parametrizadas**: Los valores nunca se concatenan en el SQL,
+    evitando errores de formato e inyección.
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Sequence, Tuple
+
+import config
+
+# Nombre de la tabla donde se guardan los registros de las imágenes.
+TABLA_IMAGENES = "imagenes"
+
+# Valor de `PRAGMA user_version` que indica que el CSV de versiones anteriores
+# ya fue importado (o que no hacía falta importarlo).
+VERSION_CSV_IMPORTADO = 1
+
+# Nombre de la tabla que relaciona cada archivo del dataset con el hash de su
+# contenido, para detectar imágenes duplicadas. Un mismo hash puede aparecer en
+# varias rutas (p. ej. la misma imagen en Train y en Test).
+TABLA_HASHES = "hashes_contenido"
+
+
+class BaseDatosMetadata:
+    """
+    Envoltorio sobre una conexión SQLite que guarda una fila por imagen.
+
+    Las columnas coinciden con `config.CABECERAS_CSV`, de modo que las filas
+    pueden intercambiarse directamente con las del archivo CSV.
+    """
+
+    def __init__(self, ruta_db: Path):
+        """
+        Abre (o crea) la base de datos y asegura que la tabla exista.
+
+        Args:
+            ruta_db (Path): Ruta del archivo SQLite.
+        """
+        # 'isolation_level=None' deja cada sentencia en modo autocommit; las
+        # cargas masivas abren su propia transacción explícita.
+        # La conexión se comparte entre el hilo de carga inicial y el de la GUI,
+        # que nunca la usan a la vez.
+        self.__conexion = sqlite3.connect(str(ruta_db), isolation_level=None, check_same_thread=False)
+        self.__conexion.execute("PRAGMA journal_mode=WAL")
+        self.__conexion.execute("PRAGMA synchronous=NORMAL")
+
+        columnas = config.CABECERAS_CSV
+        definiciones = ", ".join(
+            f"{columna} TEXT PRIMARY KEY" if columna == "id_imagen" else f"{columna} TEXT"
+            for columna in columnas
+        )
+        self.__conexion.execute(f"CREATE TABLE IF NOT EXISTS {TABLA_IMAGENES} ({definiciones})")
+        self.__conexion.execute(f"CREATE INDEX IF NOT EXISTS idx_id_paciente ON {TABLA_IMAGENES} (id_paciente)")
+        self.__conexion.execute(f"CREATE INDEX IF NOT EXISTS idx_conjunto_datos ON {TABLA_IMAGENES} (conjunto_datos)")
+        self.__crear_tabla_hashes()
+
+        marcadores = ", ".join("?" for _ in columnas)
+        self.__sql_select = f"SELECT {', '.join(columnas)} FROM {TABLA_IMAGENES} ORDER BY rowid"
+        self.__sql_guardar = f"INSERT OR REPLACE INTO {TABLA_IMAGENES} ({', '.join(columnas)}) VALUES ({marcadores})"
+        self.__sql_eliminar = f"DELETE FROM {TABLA_IMAGENES} WHERE id_imagen = ?"
+
+    def esta_vacia(self) -> bool:
+        """Indica si la base de datos aún no tiene ningún registro."""
+        return self.__conexion.execute(f"SELECT 1 FROM {TABLA_IMAGENES} LIMIT 1").fetchone() is None
+
+    def csv_importado(self) -> bool:
+        """Indica si ya se resolvió la importación única del CSV anterior."""
+        return self.__conexion.execute("PRAGMA user_version").fetchone()[0] >= VERSION_CSV_IMPORTADO
+
+    def marcar_csv_importado(self):
+        """Registra que la importación del CSV anterior ya no debe repetirse."""
+        self.__conexion.execute(f"PRAGMA user_version = {VERSION_CSV_IMPORTADO}")
+
+    def iterar_filas(self) -> Iterator[Tuple]:
+        """
+        Recorre todos los registros en orden de inserción.
+
+        Yields:
+            Tuple: Los valores de cada registro en el orden de `config.CABECERAS_CSV`.
+        """
+        yield from self.__conexion.execute(self.__sql_select)
+
+    def guardar(self, fila: Sequence):
+        """
+        Inserta un registro o reemplaza el existente con el mismo ID.
+
+        Args:
+            fila (Sequence): Valores en el orden de `config.CABECERAS_CSV`.
+        """
+        self.__conexion.execute(self.__sql_guardar, tuple(fila))
+
+    def guardar_lote(self, filas: Iterable[Sequence]):
+        """
+        Inserta o reemplaza muchos registros dentro de una única transacción.
+
+        Args:
+            filas (Iterable[Sequence]): Filas en el orden de `config.CABECERAS_CSV`.
+        """
+        with self.__conexion:
+            self.__conexion.execute("BEGIN")
+            self.__conexion.executemany(self.__sql_guardar, filas)
+
+    def eliminar(self, id_imagen: str):
+        """
+        Elimina el registro de una imagen.
+
+        Args:
+            id_imagen (str): El ID de la imagen a eliminar.
+        """
+        self.__conexion.execute(self.__sql_eliminar, (id_imagen,))
+
+    def obtener_hashes(self) -> Dict[str, str]:
+        """
+        Retorna el índice de hashes de contenido conocido.
+
+        Returns:
+            Dict[str, str]: Diccionario {ruta_archivo: hash}.
+        """
+        return dict(self.__conexion.execute(f"SELECT ruta_archivo, hash FROM {TABLA_HASHES}"))
+
+    def eliminar_hash(self, ruta_archivo: str):
+        """
+        Elimina del índice de contenido el hash de un archivo.
+
+        Args:
+            ruta_archivo (str): Ruta del archivo.
+        """
+        self.__conexion.execute(f"DELETE FROM {TABLA_HASHES} WHERE ruta_archivo = ?", (ruta_archivo,))
+
+    def guardar_hash(self, hash_contenido: str, ruta_archivo: str):
+        """
+        Registra (o reemplaza) el hash del contenido de un archivo.
+
+        Args:
+            hash_contenido (str): Hash hexadecimal del contenido del archivo.
+            ruta_archivo (str): Ruta del archivo con ese contenido.
+        """
+        self.__conexion.execute(
+            f"INSERT OR REPLACE INTO {TABLA_HASHES} (ruta_archivo, hash) VALUES (?, ?)",
+            (ruta_archivo, hash_contenido)
+        )
+
+    def __crear_tabla_hashes(self):
+        """
+        Crea la tabla del índice de contenido, con una fila por archivo.
+
+        Las bases de datos anteriores guardaban una sola ruta por hash (el hash
+        era la clave primaria); sus filas se trasladan a la nueva tabla.
+        """
+        columnas = self.__conexion.execute(f"PRAGMA table_info({TABLA_HASHES})").fetchall()
+        # Cada columna es (cid, nombre, tipo, notnull, valor_defecto, pk).
+        if any(nombre == "hash" and pk for _, nombre, _, _, _, pk in columnas):
+            with self.__conexion:
+                self.__conexion.execute("BEGIN")
+                self.__conexion.execute(f"ALTER TABLE {TABLA_HASHES} RENAME TO {TABLA_HASHES}_anterior")
+                self.__conexion.execute(f"CREATE TABLE {TABLA_HASHES} (ruta_archivo TEXT PRIMARY KEY, hash TEXT)")
+                self.__conexion.execute(
+                    f"INSERT OR REPLACE INTO {TABLA_HASHES} (ruta_archivo, hash) "
+                    f"SELECT ruta_archivo, hash FROM {TABLA_HASHES}_anterior"
+                )
+                self.__conexion.execute(f"DROP TABLE {TABLA_HASHES}_anterior")
+        else:
+            self.__conexion.execute(f"CREATE TABLE IF NOT EXISTS {TABLA_HASHES} (ruta_archivo TEXT PRIMARY KEY, hash TEXT)")
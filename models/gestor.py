@@ -15,15 +15,55 @@ Principios de Diseño Aplicados:
     implementaciones concretas, lo que facilita los cambios.
 """
 
-import uuid
-from datetime import date, datetime
+import os
+import stat
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import config
 import utils
+from models.db import BaseDatosMetadata
 from models.imagen import Imagen
 
+
+@lru_cache(maxsize=4096)
+def _parsear_fecha(texto: str) -> date:
+    """
+    Convierte una fecha en formato ISO (YYYY-MM-DD) en un objeto `date`.
+
+    `date.fromisoformat` evita interpretar un formato en cada llamada, y la
+    caché reutiliza el resultado para las fechas repetidas del dataset.
+    """
+    return date.fromisoformat(texto)
+
+
+def _stat_o_none(ruta: Path) -> Optional[os.stat_result]:
+    """Retorna el resultado de `os.stat` sobre la ruta, o None si no existe."""
+    try:
+        return os.stat(ruta)
+    except OSError:
+        return None
+
+
+def _es_mismo_archivo(st_a: Optional[os.stat_result], st_b: Optional[os.stat_result]) -> bool:
+    """Indica si dos resultados de `os.stat` corresponden al mismo archivo en disco."""
+    if st_a is None or st_b is None:
+        return False
+    return (st_a.st_dev, st_a.st_ino) == (st_b.st_dev, st_b.st_ino)
+
+
+def _ruta_conjunto(conjunto: str) -> Path:
+    """Retorna la carpeta del dataset correspondiente a un conjunto de datos."""
+    ruta = config.RUTAS_CONJUNTOS.get(conjunto)
+    return ruta if ruta is not None else config.RUTA_DATASET / conjunto
+
+
 class GestorImagenes:
     """
     Clase central que gestiona todas las operaciones sobre las imágenes.
@@ -33,68 +73,133 @@ class GestorImagenes:
         """
         Inicializa el gestor.
         
-        Al crearse, automáticamente se asegura de que la estructura de carpetas
-        exista y carga cualquier metadata previamente guardada del archivo CSV.
+        La creación no toca el disco: la estructura de carpetas y la metadata
+        del CSV se preparan de forma diferida en `asegurar_carga`, que puede
+        ejecutarse en un hilo en segundo plano o, en su defecto, la primera vez
+        que un método necesite los datos.
+        """
+        # Imágenes en memoria indexadas por su ID. Un diccionario conserva el orden
+        # de inserción y permite buscar, añadir y eliminar en O(1).
+        self.__imagenes: Dict[str, Imagen] = {}
+        # Lista de imágenes ya construida para `obtener_imagenes_como_objetos`;
+        # se invalida (None) cada vez que los datos cambian.
+        self.__cache_lista: Optional[List[Imagen]] = None
+        # Base de datos SQLite con la metadata; se abre en `inicializar_entorno`.
+        self.__db: Optional[BaseDatosMetadata] = None
+        # Sincronización de la carga diferida: el evento indica que ya terminó
+        # y el candado evita que dos hilos la ejecuten a la vez.
+        self.__carga_completa = threading.Event()
+        self.__candado_carga = threading.Lock()
+        # Error producido durante la carga, si la hubo; no se reintenta.
+        self.__error_carga: Optional[Exception] = None
+        # Hilos para las copias de archivos, que se solapan con el guardado de la metadata.
+        self.__pool_io = ThreadPoolExecutor(max_workers=2)
+        # Índice {(carpeta, hash del contenido): ruta} de los archivos copiados al
+        # dataset, para reutilizar un archivo idéntico de la misma carpeta en lugar
+        # de duplicarlo, y su inverso {ruta: hash}.
+        self.__rutas_por_hash: Dict[Tuple[str, str], str] = {}
+        self.__hash_por_ruta: Dict[str, str] = {}
+        # Cantidad de imágenes que usan cada archivo: uno compartido no se borra
+        # hasta que deja de usarlo la última imagen.
+        self.__usos_por_ruta: Dict[str, int] = {}
+
+    def asegurar_carga(self):
+        """
+        Inicializa el entorno y carga la metadata si aún no se ha hecho.
+
+        Es seguro llamarlo desde varios hilos: la carga se ejecuta una sola vez
+        y las llamadas concurrentes esperan a que termine.
+
+        Raises:
+            RuntimeError: Si la carga falló (en esta llamada o en una anterior).
         """
-        self.__lista_imagenes: List[Imagen] = []
-        self.inicializar_entorno()
-        self.cargar_metadata_existente()
+        if not self.__carga_completa.is_set():
+            with self.__candado_carga:
+                if not self.__carga_completa.is_set():
+                    try:
+                        self.inicializar_entorno()
+                        self.cargar_metadata_existente()
+                    except Exception as e:
+                        self.__error_carga = e
+                    finally:
+                        self.__carga_completa.set()
+
+        if self.__error_carga is not None:
+            raise RuntimeError(f"No se pudo cargar la metadata: {self.__error_carga}") from self.__error_carga
+
+    def carga_completa(self) -> bool:
+        """Indica si la carga de la metadata terminó (con éxito o con error)."""
+        return self.__carga_completa.is_set()
+
+    def error_carga(self) -> Optional[Exception]:
+        """Retorna el error que impidió cargar la metadata, o None si no lo hubo."""
+        return self.__error_carga
 
     def inicializar_entorno(self):
         """
-        Asegura que la estructura de directorios y el archivo CSV existan.
+        Asegura que la estructura de directorios y la base de datos existan.
+
+        La primera vez que se abre la base de datos, si está vacía y existe un
+        `metadata.csv` de una versión anterior, importa sus registros en una
+        única transacción. La importación queda marcada en la base de datos y no
+        se repite, aunque luego se eliminen todas las imágenes.
         
         Utiliza las funciones de `utils` y las constantes de `config`.
         """
         print("Inicializando entorno del proyecto...")
         
         # Preparamos la lista de subcarpetas del dataset que deben existir.
-        subcarpetas_dataset = [config.RUTA_DATASET / sub for sub in config.CARPETAS_DATASET]
+        subcarpetas_dataset = list(config.RUTAS_CONJUNTOS.values())
         
         # Delegamos la creación de carpetas a nuestra función de utilidad.
         utils.gestionar_rutas(config.RUTA_DATA, subcarpetas_dataset)
 
-        # Si el archivo metadata.csv no existe, lo crea con las cabeceras.
-        if not config.RUTA_METADATA_CSV.exists():
-            print(f"Creando archivo de metadatos en: {config.RUTA_METADATA_CSV}")
-            # Escribimos un archivo vacío con solo las cabeceras.
-            utils.escribir_csv(config.RUTA_METADATA_CSV, [], config.CABECERAS_CSV)
+        # Abre (o crea) la base de datos de metadatos.
+        self.__db = BaseDatosMetadata(config.RUTA_METADATA_DB)
+
+        # Importa el CSV existente la primera vez que se usa la base de datos.
+        # Una base de datos con registros pero sin la marca viene de una versión
+        # que aún no la guardaba: ya se importó y solo falta marcarla.
+        if not self.__db.csv_importado():
+            if self.__db.esta_vacia() and config.RUTA_METADATA_CSV.exists():
+                print(f"Importando metadatos desde: {config.RUTA_METADATA_CSV}")
+                self.__db.guardar_lote(self.__iterar_filas_csv(config.RUTA_METADATA_CSV))
+            self.__db.marcar_csv_importado()
+
+        self.__hash_por_ruta = self.__db.obtener_hashes()
+        self.__rutas_por_hash = {
+            (os.path.dirname(ruta), hash_archivo): ruta for ruta, hash_archivo in self.__hash_por_ruta.items()
+        }
 
     def cargar_metadata_existente(self):
         """
-        Lee el archivo CSV y carga los datos en la memoria de la aplicación.
+        Lee la base de datos y carga los datos en la memoria de la aplicación.
         
-        Convierte cada fila del CSV en un objeto `Imagen` y lo almacena en la
-        lista interna `__lista_imagenes`.
+        Convierte cada registro en un objeto `Imagen` y lo almacena en el
+        diccionario interno `__imagenes`, indexado por su ID.
         """
         print("Cargando metadatos existentes...")
-        datos_csv = utils.leer_csv(config.RUTA_METADATA_CSV)
-        
-        for fila in datos_csv:
-            # Convertimos los datos del CSV (que son strings) a los tipos correctos.
-            fecha_obj = datetime.strptime(fila["fecha_adquisicion"], "%Y-%m-%d").date()
-            
-            # Creamos la instancia de Imagen.
-            imagen_obj = Imagen(
-                id_imagen=fila["id_imagen"],
-                ruta_archivo=fila["ruta_archivo"],
-                id_paciente=fila["id_paciente"],
-                fecha_adquisicion=fecha_obj,
-                diagnostico=fila["diagnostico"],
-                conjunto_datos=fila["conjunto_datos"],
-                coordenadas_fovea=(float(fila["Fovea_X"]), float(fila["Fovea_Y"])) if fila["Fovea_X"] and fila["Fovea_Y"] else None,
-                dimensiones=(int(fila["Size_X"]), int(fila["Size_Y"])) if fila["Size_X"] and fila["Size_Y"] else None
-            )
-            self.__lista_imagenes.append(imagen_obj)
-        
-        print(f"Se han cargado {len(self.__lista_imagenes)} registros.")
+
+        # Los registros se procesan a medida que se leen, sin una lista intermedia.
+        # Enlazamos en variables locales lo que se usa en cada iteración, para
+        # no repetir la búsqueda de atributos con muchos registros.
+        imagenes = self.__imagenes
+        usos = self.__usos_por_ruta
+        fila_a_imagen = self.__fila_a_imagen
+        for fila in self.__db.iterar_filas():
+            imagen_obj = fila_a_imagen(fila)
+            imagenes[imagen_obj.id_imagen] = imagen_obj
+            usos[imagen_obj.ruta_archivo] = usos.get(imagen_obj.ruta_archivo, 0) + 1
+        self.__cache_lista = None
+
+        print(f"Se han cargado {len(self.__imagenes)} registros.")
 
     def registrar_nueva_imagen(self, ruta_origen_str: str, metadata: Dict) -> bool:
         """
         Registra una nueva imagen en el sistema.
 
         Esto implica: copiar el archivo, generar un ID, crear un objeto Imagen
-        y guardar la nueva metadata en el CSV.
+        e insertar la nueva metadata en la base de datos.
 
         Args:
             ruta_origen_str (str): La ruta del archivo de imagen a registrar.
@@ -103,6 +208,7 @@ class GestorImagenes:
         Returns:
             bool: True si el registro fue exitoso, False en caso contrario.
         """
+        self.asegurar_carga()
         ruta_origen = Path(ruta_origen_str)
         if not ruta_origen.exists():
             print(f"Error: El archivo de origen no existe: {ruta_origen}")
@@ -112,9 +218,10 @@ class GestorImagenes:
         nuevo_id = self.__generar_id_unico()
         conjunto = metadata.get("conjunto_datos", "Train") # 'Train' por defecto
         
-        # 2. Definir ruta de destino y copiar el archivo
-        ruta_destino = config.RUTA_DATASET / conjunto / ruta_origen.name
-        utils.copiar_archivo(ruta_origen, ruta_destino)
+        # 2. Definir ruta de destino y lanzar la copia del archivo en segundo plano,
+        #    para que avance mientras se prepara y se guarda la metadata.
+        ruta_destino = _ruta_conjunto(conjunto) / ruta_origen.name
+        copia = self.__pool_io.submit(self.__copiar_imagen, ruta_origen, ruta_destino)
         
         # 3. Crear el objeto Imagen
         nueva_imagen = Imagen(
@@ -130,12 +237,31 @@ class GestorImagenes:
 
         # 4. Validar y guardar
         if nueva_imagen.validar_metadata():
-            self.__lista_imagenes.append(nueva_imagen)
-            self.__guardar_metadata_en_csv()
+            self.__imagenes[nuevo_id] = nueva_imagen
+            self.__cache_lista = None
+            self.__db.guardar(nueva_imagen.a_tupla())
+
+            # 5. Esperar a que termine la copia; si falló, se revierte el registro.
+            hash_archivo, ruta_final = copia.result()
+            if ruta_final is None:
+                del self.__imagenes[nuevo_id]
+                self.__cache_lista = None
+                self.__db.eliminar(nuevo_id)
+                print(f"No se pudo registrar la imagen '{nuevo_id}' porque falló la copia del archivo.")
+                return False
+
+            # Si el contenido ya existía en el dataset, el registro apunta a ese archivo.
+            if ruta_final != ruta_destino:
+                nueva_imagen.actualizar({"ruta_archivo": str(ruta_final)})
+                self.__db.guardar(nueva_imagen.a_tupla())
+            self.__sumar_uso(nueva_imagen.ruta_archivo)
+            self.__indexar_hash(hash_archivo, nueva_imagen.ruta_archivo)
+
             print(f"Imagen '{nuevo_id}' registrada exitosamente.")
             return True
         else:
             # En un caso real, aquí se debería borrar el archivo copiado.
+            copia.result()
             print(f"No se pudo registrar la imagen '{nuevo_id}' por metadatos inválidos.")
             return False
 
@@ -147,82 +273,303 @@ class GestorImagenes:
             id_imagen (str): El ID de la imagen a modificar.
             nuevos_datos (Dict): Diccionario con los campos y valores a actualizar.
         """
+        self.asegurar_carga()
+        imagen = self.__buscar_imagen_por_id(id_imagen)
+        if not imagen:
+            print(f"Error: No se encontró la imagen con ID '{id_imagen}'.")
+            return
+
         ruta_origen = Path(nuevos_datos.get("ruta_archivo", ""))
-        if not ruta_origen.exists():
+        # Un único stat por ruta: sirve para comprobar su existencia y, mediante
+        # (st_dev, st_ino), para saber si dos rutas apuntan al mismo archivo sin
+        # tener que resolverlas.
+        st_origen = _stat_o_none(ruta_origen)
+        if st_origen is None or not stat.S_ISREG(st_origen.st_mode):
             print(f"Error: El archivo de origen no existe: {ruta_origen}")
             return False
 
-        ruta_destino = config.RUTA_DATASET / nuevos_datos.get("conjunto_datos", "Train") / ruta_origen.name
-        if ruta_origen.resolve() != ruta_destino.resolve(): # Solo copiar si son diferentes
-            utils.copiar_archivo(ruta_origen, ruta_destino)
-            utils.verificar_duplicados_dataset(ruta_origen, ruta_destino)
+        ruta_destino = _ruta_conjunto(nuevos_datos.get("conjunto_datos", "Train")) / ruta_origen.name
+        st_destino = _stat_o_none(ruta_destino)
+        if not _es_mismo_archivo(st_origen, st_destino): # Solo copiar si son diferentes
+            copiar = True
+            if st_destino is not None and self.__archivo_compartido(str(ruta_destino), imagen):
+                # Otra imagen ya usa ese nombre: su archivo no se sobreescribe.
+                try:
+                    hash_archivo = utils.hash_contenido(ruta_origen)
+                except OSError as e:
+                    print(f"Error al leer el archivo '{ruta_origen}': {e}")
+                    return False
+                if utils.archivo_con_contenido(ruta_destino, hash_archivo, st_origen.st_size):
+                    copiar = False
+                else:
+                    ruta_destino, copiar = self.__ruta_libre(ruta_destino, hash_archivo, st_origen.st_size)
+            if copiar and not utils.copiar_archivo(ruta_origen, ruta_destino):
+                return False
+            # Si otra imagen usa el archivo de origen, se copia sin borrarlo.
+            if not self.__archivo_compartido(str(ruta_origen), imagen):
+                utils.verificar_duplicados_dataset(ruta_origen, ruta_destino)
             nuevos_datos["ruta_archivo"] = str(ruta_destino)
-        
-        imagen = self.__buscar_imagen_por_id(id_imagen)
-        if not imagen:
-            print(f"Error: No se encontró la imagen con ID '{id_imagen}'.")
-            return
+            st_destino = _stat_o_none(ruta_destino)
 
-        if Path(imagen.ruta_archivo).exists() and Path(imagen.ruta_archivo).resolve() != ruta_destino.resolve():
-            utils.verificar_duplicados_dataset(Path(imagen.ruta_archivo), ruta_destino)
+        ruta_actual = Path(imagen.ruta_archivo)
+        st_actual = _stat_o_none(ruta_actual)
+        if (st_actual is not None and not _es_mismo_archivo(st_actual, st_destino)
+                and not self.__archivo_compartido(imagen.ruta_archivo, imagen)):
+            utils.verificar_duplicados_dataset(ruta_actual, ruta_destino)
 
         # Actualiza los atributos del objeto con los nuevos datos.
-        for campo, valor in nuevos_datos.items():
-            if hasattr(imagen, campo):
-                setattr(imagen, campo, valor)
+        ruta_anterior = imagen.ruta_archivo
+        imagen.actualizar(nuevos_datos)
+        self.__cache_lista = None
+
+        # Si la imagen cambió de archivo, se actualizan los usos y el índice de hashes.
+        if imagen.ruta_archivo != ruta_anterior:
+            self.__sumar_uso(imagen.ruta_archivo)
+            if self.__restar_uso(ruta_anterior) == 0:
+                hash_archivo = self.__desindexar_ruta(ruta_anterior)
+                # El contenido se movió sin cambios: el hash pasa a la nueva ruta.
+                if hash_archivo is not None and str(ruta_origen) == ruta_anterior:
+                    self.__indexar_hash(hash_archivo, imagen.ruta_archivo)
         
-        self.__guardar_metadata_en_csv()
+        # Solo se actualiza el registro de esta imagen.
+        self.__db.guardar(imagen.a_tupla())
         print(f"Metadata de la imagen '{id_imagen}' actualizada.")
         return True
 
     def eliminar_imagen_por_id(self, id_imagen: str):
         """
-        Elimina una imagen del sistema (archivo y registro en CSV).
+        Elimina una imagen del sistema (archivo y registro en la base de datos).
 
         Args:
             id_imagen (str): El ID de la imagen a eliminar.
         """
+        self.asegurar_carga()
         imagen = self.__buscar_imagen_por_id(id_imagen)
         if not imagen:
             print(f"Error: No se encontró la imagen con ID '{id_imagen}'.")
             return
 
-        # 1. Eliminar el archivo físico
-        try:
-            Path(imagen.ruta_archivo).unlink()
-        except OSError as e:
-            print(f"Error al eliminar el archivo físico '{imagen.ruta_archivo}': {e}")
-            # Se podría decidir si continuar o no, por ahora continuamos.
+        # 1. Eliminar el archivo físico, salvo que otra imagen comparta el mismo archivo
+        if self.__restar_uso(imagen.ruta_archivo) > 0:
+            print(f"El archivo '{imagen.ruta_archivo}' se conserva porque lo usa otra imagen.")
+        else:
+            self.__desindexar_ruta(imagen.ruta_archivo)
+            try:
+                Path(imagen.ruta_archivo).unlink()
+            except OSError as e:
+                print(f"Error al eliminar el archivo físico '{imagen.ruta_archivo}': {e}")
+                # Se podría decidir si continuar o no, por ahora continuamos.
 
-        # 2. Eliminar de la lista en memoria
-        self.__lista_imagenes.remove(imagen)
+        # 2. Eliminar de la memoria
+        del self.__imagenes[id_imagen]
+        self.__cache_lista = None
         
-        # 3. Reescribir el CSV sin el registro eliminado
-        self.__guardar_metadata_en_csv()
+        # 3. Eliminar su registro de la base de datos
+        self.__db.eliminar(id_imagen)
         print(f"Imagen '{id_imagen}' eliminada exitosamente.")
 
     def obtener_imagenes_como_objetos(self) -> List[Imagen]:
-        """Retorna una copia de la lista de objetos Imagen."""
-        return self.__lista_imagenes.copy()
+        """
+        Retorna la lista de objetos Imagen, en orden de registro.
+
+        La lista se construye una sola vez y se reutiliza hasta que se registre,
+        modifique o elimine una imagen, por lo que no debe modificarse.
+        """
+        self.asegurar_carga()
+        if self.__cache_lista is None:
+            self.__cache_lista = list(self.__imagenes.values())
+        return self.__cache_lista
+
+    def obtener_imagen_por_id(self, id_imagen: str) -> Optional[Imagen]:
+        """
+        Retorna el objeto Imagen con el ID indicado.
+
+        Args:
+            id_imagen (str): El ID de la imagen buscada.
+
+        Returns:
+            Optional[Imagen]: La imagen, o None si no existe.
+        """
+        self.asegurar_carga()
+        return self.__buscar_imagen_por_id(id_imagen)
+
+    def exportar_metadata_csv(self, ruta_archivo: Path = config.RUTA_EXPORTACION_CSV):
+        """
+        Exporta toda la metadata a un archivo CSV, sobreescribiendo el anterior.
+
+        Cada imagen se serializa como tupla en el orden de las cabeceras, y las
+        filas se generan a medida que se escriben.
+
+        Args:
+            ruta_archivo (Path): Ruta del CSV a generar (por defecto, `metadata_exportada.csv`).
+        """
+        self.asegurar_carga()
+        filas = (img.a_tupla() for img in self.__imagenes.values())
+        utils.escribir_filas_csv(ruta_archivo, filas, config.CABECERAS_CSV)
+        print(f"Metadata exportada a: {ruta_archivo}")
 
     # --- Métodos Privados (Helpers) ---
 
-    def __guardar_metadata_en_csv(self):
+    def __iterar_filas_csv(self, ruta_archivo: Path) -> Iterator[Tuple[str, ...]]:
+        """
+        Recorre un CSV de metadatos y produce cada fila como tupla.
+
+        Las filas se entregan en el orden de `config.CABECERAS_CSV`, sin importar
+        el orden de las columnas en el archivo, y sin construir un diccionario
+        por fila.
+        """
+        filas = utils.iterar_filas_csv(ruta_archivo)
+        cabeceras = next(filas, None)
+        if cabeceras is None:
+            return
+        posiciones = {nombre: i for i, nombre in enumerate(cabeceras)}
+        extraer_valores = itemgetter(*(posiciones[nombre] for nombre in config.CABECERAS_CSV))
+        for fila in filas:
+            yield extraer_valores(fila)
+
+    def __copiar_imagen(self, ruta_origen: Path, ruta_destino: Path) -> Tuple[Optional[str], Optional[Path]]:
+        """
+        Copia una imagen al dataset, evitando guardar contenido duplicado.
+
+        Si la carpeta de destino ya tiene un archivo con el mismo contenido
+        (aunque con otro nombre), se reutiliza ese archivo en lugar de copiar.
+        El índice de hashes solo sirve para encontrar al candidato: la
+        coincidencia se confirma con el tamaño y el hash del candidato. El
+        archivo de origen se lee una sola vez para calcular su hash.
+
+        Returns:
+            Tuple[Optional[str], Optional[Path]]: El hash del contenido y la ruta del
+                                                  archivo en el dataset (None si la
+                                                  copia falló).
+        """
+        try:
+            tamano = ruta_origen.stat().st_size
+            hash_archivo = utils.hash_contenido(ruta_origen)
+        except OSError as e:
+            print(f"Error al leer el archivo '{ruta_origen}': {e}")
+            return None, None
+
+        ruta_existente = self.__rutas_por_hash.get((str(ruta_destino.parent), hash_archivo))
+        if ruta_existente is not None:
+            ruta_existente = Path(ruta_existente)
+            if utils.archivo_con_contenido(ruta_existente, hash_archivo, tamano):
+                print(f"El contenido ya existe en el dataset como '{ruta_existente}'; no se copia.")
+                return hash_archivo, ruta_existente
+
+        if utils.archivo_con_contenido(ruta_destino, hash_archivo, tamano):
+            # El destino ya tiene el mismo contenido; no se copia.
+            print(f"El archivo '{ruta_destino}' ya existe con el mismo contenido.")
+            return hash_archivo, ruta_destino
+        if self.__usos_por_ruta.get(str(ruta_destino), 0) > 0:
+            # Otras imágenes usan un archivo distinto con el mismo nombre: no se
+            # sobreescribe, se guarda con un nombre libre.
+            ruta_destino, copiar = self.__ruta_libre(ruta_destino, hash_archivo, tamano)
+            if not copiar:
+                print(f"El archivo '{ruta_destino}' ya existe con el mismo contenido.")
+                return hash_archivo, ruta_destino
+        if utils.copiar_archivo(ruta_origen, ruta_destino):
+            return hash_archivo, ruta_destino
+        return hash_archivo, None
+
+    def __ruta_libre(self, ruta_destino: Path, hash_archivo: str, tamano: int) -> Tuple[Path, bool]:
         """
-        Convierte la lista de objetos Imagen a una lista de diccionarios y la
-        escribe en el archivo CSV, sobreescribiendo el contenido anterior.
+        Busca un nombre alternativo para guardar un contenido junto a `ruta_destino`.
+
+        Prueba `nombre_<hash>.ext`, `nombre_<hash>_2.ext`, etc., hasta dar con uno
+        que no exista, que ya tenga el mismo contenido o que ninguna imagen use.
+
+        Returns:
+            Tuple[Path, bool]: La ruta elegida y si hace falta copiar el archivo
+                               (False si ya tiene el mismo contenido).
         """
-        datos_para_csv = [img.a_diccionario() for img in self.__lista_imagenes]
-        utils.escribir_csv(config.RUTA_METADATA_CSV, datos_para_csv, config.CABECERAS_CSV)
+        base = f"{ruta_destino.stem}_{hash_archivo[:8]}"
+        intento = 1
+        while True:
+            sufijo = "" if intento == 1 else f"_{intento}"
+            candidata = ruta_destino.with_name(f"{base}{sufijo}{ruta_destino.suffix}")
+            if not candidata.exists():
+                return candidata, True
+            if utils.archivo_con_contenido(candidata, hash_archivo, tamano):
+                return candidata, False
+            if self.__usos_por_ruta.get(str(candidata), 0) == 0:
+                return candidata, True
+            intento += 1
+
+    def __archivo_compartido(self, ruta_archivo: str, imagen: Imagen) -> bool:
+        """Indica si alguna imagen distinta de `imagen` usa el archivo indicado (O(1))."""
+        usos = self.__usos_por_ruta.get(ruta_archivo, 0)
+        if imagen.ruta_archivo == ruta_archivo:
+            usos -= 1
+        return usos > 0
+
+    def __sumar_uso(self, ruta_archivo: str):
+        """Registra que una imagen más usa el archivo indicado."""
+        self.__usos_por_ruta[ruta_archivo] = self.__usos_por_ruta.get(ruta_archivo, 0) + 1
+
+    def __restar_uso(self, ruta_archivo: str) -> int:
+        """Registra que una imagen dejó de usar el archivo y retorna los usos restantes."""
+        usos = self.__usos_por_ruta.get(ruta_archivo, 0) - 1
+        if usos > 0:
+            self.__usos_por_ruta[ruta_archivo] = usos
+            return usos
+        self.__usos_por_ruta.pop(ruta_archivo, None)
+        return 0
+
+    def __indexar_hash(self, hash_archivo: str, ruta_archivo: str):
+        """Asocia un hash de contenido a un archivo, en memoria y en la base de datos."""
+        hash_anterior = self.__hash_por_ruta.get(ruta_archivo)
+        if hash_anterior is not None and hash_anterior != hash_archivo:
+            # El archivo fue sobreescrito con otro contenido.
+            self.__desindexar_ruta(ruta_archivo)
+        self.__rutas_por_hash[(os.path.dirname(ruta_archivo), hash_archivo)] = ruta_archivo
+        self.__hash_por_ruta[ruta_archivo] = hash_archivo
+        self.__db.guardar_hash(hash_archivo, ruta_archivo)
+
+    def __desindexar_ruta(self, ruta_archivo: str) -> Optional[str]:
+        """Quita del índice el hash de un archivo y lo retorna (None si no estaba)."""
+        hash_archivo = self.__hash_por_ruta.pop(ruta_archivo, None)
+        if hash_archivo is not None:
+            clave = (os.path.dirname(ruta_archivo), hash_archivo)
+            if self.__rutas_por_hash.get(clave) == ruta_archivo:
+                del self.__rutas_por_hash[clave]
+            self.__db.eliminar_hash(ruta_archivo)
+        return hash_archivo
+
+    def __fila_a_imagen(self, valores: Tuple[str, ...]) -> Imagen:
+        """
+        Convierte un registro de la base de datos en un objeto Imagen.
+
+        Args:
+            valores (Tuple[str, ...]): Los valores del registro (todos strings) en el
+                                       orden de `config.CABECERAS_CSV`.
+        """
+        (id_imagen, ruta_archivo, id_paciente, fecha_adquisicion, diagnostico,
+         conjunto_datos, fovea_x, fovea_y, size_x, size_y) = valores
+
+        return Imagen(
+            id_imagen=id_imagen,
+            ruta_archivo=ruta_archivo,
+            # Los campos categóricos se repiten mucho entre filas: al internarlos,
+            # todas las imágenes comparten un único objeto str por valor.
+            id_paciente=sys.intern(id_paciente),
+            fecha_adquisicion=_parsear_fecha(fecha_adquisicion),
+            diagnostico=sys.intern(diagnostico),
+            conjunto_datos=sys.intern(conjunto_datos),
+            coordenadas_fovea=(float(fovea_x), float(fovea_y)) if fovea_x and fovea_y else None,
+            dimensiones=(int(size_x), int(size_y)) if size_x and size_y else None
+        )
 
     def __buscar_imagen_por_id(self, id_imagen: str) -> Optional[Imagen]:
-        """Busca y retorna un objeto Imagen por su ID."""
-        for imagen in self.__lista_imagenes:
-            if imagen.id_imagen == id_imagen:
-                return imagen
-        return None
+        """Busca y retorna un objeto Imagen por su ID en el diccionario en memoria."""
+        return self.__imagenes.get(id_imagen)
 
     def __generar_id_unico(self) -> str:
         """Genera un ID único y corto para una nueva imagen."""
-        # uuid4() genera un ID largo y aleatorio. Tomamos solo los primeros 8 caracteres.
-        return f"img_{uuid.uuid4().hex[:8]}"
\ No newline at end of file
+        # 4 bytes aleatorios del sistema operativo dan 8 caracteres hexadecimales,
+        # sin construir un objeto UUID para descartar la mayor parte de él.
+        # Con IDs tan cortos pueden producirse colisiones, así que repetimos hasta
+        # obtener uno que no exista en memoria (comprobación O(1)).
+        while True:
+            nuevo_id = f"img_{os.urandom(4).hex()}"
+            if nuevo_id not in self.__imagenes:
+                return nuevo_id
\ No newline at end of file
@@ -17,7 +17,11 @@ Principios de Diseño Aplicados:
 # 'datetime' para trabajar con fechas de adquisición.
 # 'Optional' y 'Tuple' para anotaciones de tipo más precisas.
 from datetime import date
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
+
+# Conjuntos de datos permitidos. Un 'frozenset' se crea una sola vez y permite
+# comprobar la pertenencia en tiempo constante.
+CONJUNTOS_VALIDOS = frozenset(("Train", "Test", "Validation"))
 
 class Imagen:
     """
@@ -41,6 +45,24 @@ class Imagen:
                                                  no se pueda leer.
     """
 
+    # Campos de metadata de la imagen.
+    CAMPOS = (
+        "id_imagen",
+        "ruta_archivo",
+        "id_paciente",
+        "fecha_adquisicion",
+        "diagnostico",
+        "conjunto_datos",
+        "coordenadas_fovea",
+        "dimensiones",
+    )
+
+    # Declarar los atributos en '__slots__' evita que cada instancia reserve
+    # un '__dict__' propio, reduciendo la memoria usada al cargar miles de
+    # imágenes y acelerando el acceso a los atributos. '_fila_tabla' guarda
+    # la fila ya formateada para la tabla de la GUI (ver `fila_tabla`).
+    __slots__ = CAMPOS + ("_fila_tabla",)
+
     def __init__(self,
                  id_imagen: str,
                  ruta_archivo: str,
@@ -62,6 +84,47 @@ class Imagen:
         self.conjunto_datos = conjunto_datos
         self.coordenadas_fovea = coordenadas_fovea
         self.dimensiones = dimensiones
+        self._fila_tabla = None
+
+    @property
+    def fila_tabla(self) -> tuple:
+        """
+        Valores de la imagen formateados para una fila de la tabla de la GUI.
+
+        Se calculan la primera vez que se piden y se reutilizan en cada
+        refresco de la tabla. Para que no queden desactualizados, los cambios
+        de metadata deben hacerse con `actualizar`.
+
+        Returns:
+            tuple: (ID, paciente, diagnóstico, fecha, conjunto, fóvea, dimensiones, ruta).
+        """
+        if self._fila_tabla is None:
+            self._fila_tabla = (
+                self.id_imagen,
+                str(self.id_paciente),
+                self.diagnostico,
+                self.fecha_adquisicion.isoformat(),
+                self.conjunto_datos,
+                f"({self.coordenadas_fovea[0]}, {self.coordenadas_fovea[1]})" if self.coordenadas_fovea else "N/A",
+                f"({self.dimensiones[0]}x{self.dimensiones[1]})" if self.dimensiones else "N/A",
+                self.ruta_archivo
+            )
+        return self._fila_tabla
+
+    def actualizar(self, nuevos_datos: Dict):
+        """
+        Actualiza los campos de metadata presentes en el diccionario.
+
+        Las claves que no correspondan a un campo de la imagen se ignoran.
+
+        Args:
+            nuevos_datos (Dict): Diccionario con los campos y valores a actualizar.
+        """
+        for campo, valor in nuevos_datos.items():
+            if campo in self.CAMPOS:
+                setattr(self, campo, valor)
+        # La fila formateada para la tabla deja de ser válida.
+        self._fila_tabla = None
 
     def validar_metadata(self) -> bool:
         """
@@ -73,8 +136,9 @@ class Imagen:
         Returns:
             bool: True si toda la metadata es válida, False en caso contrario.
         """
-        # Verificamos que los campos de texto no estén vacíos.
-        if not all([self.id_imagen, self.ruta_archivo, self.id_paciente, self.diagnostico]):
+        # Verificamos que los campos de texto no estén vacíos (evaluación en
+        # cortocircuito, sin construir una lista temporal).
+        if not (self.id_imagen and self.ruta_archivo and self.id_paciente and self.diagnostico):
             print(f"Error de validación: El ID '{self.id_imagen}' tiene campos de texto vacíos.")
             return False
 
@@ -84,39 +148,39 @@ class Imagen:
             return False
 
         # Verificamos que el conjunto de datos sea uno de los valores permitidos.
-        conjuntos_validos = ["Train", "Test", "Validation"]
-        if self.conjunto_datos not in conjuntos_validos:
+        if self.conjunto_datos not in CONJUNTOS_VALIDOS:
             print(f"Error de validación: El conjunto '{self.conjunto_datos}' no es válido.")
             return False
 
         # Si todas las validaciones pasan, retornamos True.
         return True
 
-    def a_diccionario(self) -> dict:
+    def a_tupla(self) -> tuple:
         """
-        Convierte la instancia de la clase en un diccionario.
+        Convierte la instancia en una tupla con el orden de `config.CABECERAS_CSV`.
+
+        Es la forma de serialización usada para la base de datos y para exportar
+        el CSV: evita crear un diccionario por imagen y que el escritor tenga que
+        buscar cada columna por nombre. Los valores numéricos se entregan sin
+        convertir, ya que `csv.writer` los pasa a texto internamente.
 
-        Útil para procesos de serialización, como guardar los datos en un CSV
-        o un JSON. Convierte la fecha a formato ISO (YYYY-MM-DD) para una
-        correcta serialización.
-        
         Returns:
-            dict: Un diccionario representando los datos de la imagen.
+            tuple: Los valores de la imagen listos para escribirse como fila.
         """
-        return {
-            "id_imagen": self.id_imagen,
-            "ruta_archivo": self.ruta_archivo,
-            "id_paciente": self.id_paciente,
-            "fecha_adquisicion": self.fecha_adquisicion.isoformat(),
-            "diagnostico": self.diagnostico,
-            "conjunto_datos": self.conjunto_datos,
-            # Convertimos las dimensiones a un string para guardarlo fácil en CSV.
-            "Fovea_X": str(self.coordenadas_fovea[0]) if self.coordenadas_fovea else "",
-            "Fovea_Y": str(self.coordenadas_fovea[1]) if self.coordenadas_fovea else "",
-            "Size_X": str(self.dimensiones[0]) if self.dimensiones else "",
-            "Size_Y": str(self.dimensiones[1]) if self.dimensiones else ""
-        }
-
+        fovea_x, fovea_y = self.coordenadas_fovea or ("", "")
+        size_x, size_y = self.dimensiones or ("", "")
+        return (
+            self.id_imagen,
+            self.ruta_archivo,
+            self.id_paciente,
+            self.fecha_adquisicion.isoformat(),
+            self.diagnostico,
+            self.conjunto_datos,
+            fovea_x,
+            fovea_y,
+            size_x,
+            size_y
+        )
 
     def __repr__(self) -> str:
         """
@@ -1,11 +1,48 @@
+import re
+import threading
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk, filedialog, messagebox
 from datetime import date
-from PIL import Image, ImageTk
+from PIL import Image
 
+import config
 # Importamos el "cerebro" de nuestra aplicación.
 from models.gestor import GestorImagenes
 
+# Limita el tamaño de las imágenes que se decodifican: un archivo corrupto o
+# enorme lanza `Image.DecompressionBombError` en lugar de congelar la aplicación.
+Image.MAX_IMAGE_PIXELS = config.MAX_PIXELES_IMAGEN
+# Registra de antemano solo los decodificadores básicos (PNG, JPEG, BMP, GIF...).
+# Junto con `formats=config.FORMATOS_IMAGEN` en `Image.open`, Pillow nunca
+# necesita cargar el resto de sus plugins.
+Image.preinit()
+
+# Texto aceptado al teclear una coordenada: un número decimal, posiblemente a
+# medio escribir (p. ej. "-" o "12.").
+_PATRON_NUMERO_PARCIAL = re.compile(r"-?\d*\.?\d*")
+
+def _es_numero_parcial(texto):
+    """Valida, tecla a tecla, el contenido propuesto (%P) para una coordenada."""
+    return _PATRON_NUMERO_PARCIAL.fullmatch(texto) is not None
+
+def _decodificar_preview(ruta_imagen):
+    """
+    Abre una imagen y genera su miniatura para la previsualización.
+
+    Se ejecuta fuera del hilo de Tkinter. `draft` permite que el decodificador
+    JPEG reduzca la imagen mientras la lee, y el filtro bilineal es suficiente
+    para una miniatura y más rápido que el filtro por defecto.
+
+    Returns:
+        tuple: La miniatura (Image), y el ancho y alto de la imagen original.
+    """
+    with Image.open(ruta_imagen, formats=config.FORMATOS_IMAGEN) as img:
+        ancho, alto = img.size
+        img.draft("RGB", (500, 500))
+        img.thumbnail((250, 250), Image.Resampling.BILINEAR) # Redimensiona para que quepa en la GUI
+        return img, ancho, alto
+
 class AplicacionGUI:
     """
     Clase que encapsula toda la interfaz gráfica de la aplicación.
@@ -22,8 +59,10 @@ class AplicacionGUI:
         self.root.title("Gestor de Imágenes Médicas - Glaucoma")
         self.root.geometry("1200x800")
 
-        # Instanciamos el cerebro de la aplicación.
+        # Instanciamos el cerebro de la aplicación y cargamos su metadata en un
+        # hilo aparte, para que la ventana se dibuje sin esperar a leer el CSV.
         self.gestor = GestorImagenes()
+        threading.Thread(target=self.gestor.asegurar_carga, daemon=True).start()
 
         # Variable para almacenar la ruta del archivo seleccionado
         self.ruta_archivo_seleccionado = tk.StringVar()
@@ -32,17 +71,65 @@ class AplicacionGUI:
         self.ancho_imagen = tk.IntVar()
         self.alto_imagen = tk.IntVar()
 
+        # Variables con las coordenadas de la fóvea. Sus entradas solo aceptan
+        # números, así que al guardar se leen directamente como float.
+        self.fovea_x = tk.DoubleVar(value="")
+        self.fovea_y = tk.DoubleVar(value="")
+
+        # Hilos para decodificar las previsualizaciones sin bloquear la interfaz,
+        # y ruta de la última previsualización pedida (las anteriores se descartan)
+        self._pool_preview = ThreadPoolExecutor(max_workers=2)
+        self._ruta_preview = None
+
+        # Imagen de Tk que muestra la previsualización (se reutiliza entre imágenes)
+        self.photo_preview = None
+
         # Bandera para distinguir entre agregar y editar
         self.es_editar = False
         
         # ID de la imagen que se está modificando (si aplica)
         self.id_a_modificar = None
 
+        # Texto del filtro de búsqueda de la tabla
+        self.filtro_texto = tk.StringVar()
+
+        # Filas (ID, valores) que cumplen el filtro actual, en orden de registro.
+        # La tabla solo muestra un prefijo de esta lista, que crece por páginas.
+        self._filas_filtradas = []
+
+        # Valores mostrados en la tabla por cada ID de imagen (que también es el
+        # identificador de su fila), para refrescar solo lo que cambie.
+        self._filas_tabla = {}
+
+        # Componentes que usan los datos del gestor. Permanecen deshabilitados
+        # hasta que termina la carga en segundo plano, para que no bloqueen la
+        # interfaz esperándola.
+        self._widgets_con_datos = []
+
         # --- Creación de los componentes de la GUI ---
         self._crear_widgets()
         
-        # --- Carga inicial de datos ---
-        self.refrescar_tabla_imagenes()
+        # --- Carga inicial de datos (cuando el gestor termine de cargar) ---
+        self._esperar_carga_inicial()
+
+    def _esperar_carga_inicial(self):
+        """
+        Rellena la tabla cuando la carga en segundo plano del gestor termina.
+
+        Si la carga falló, muestra el error y deja deshabilitados los
+        componentes que dependen de los datos.
+        """
+        if self.gestor.carga_completa():
+            error = self.gestor.error_carga()
+            if error is not None:
+                messagebox.showerror("Error", f"No se pudo cargar la metadata:\n{error}")
+                return
+            for widget in self._widgets_con_datos:
+                widget.state(["!disabled"])
+            self.refrescar_tabla_imagenes()
+        else:
+            # Tkinter no es seguro entre hilos: consultamos desde el bucle principal.
+            self.root.after(50, self._esperar_carga_inicial)
 
     def _crear_widgets(self):
         """Crea y organiza todos los componentes visuales de la aplicación."""
@@ -81,12 +168,15 @@ class AplicacionGUI:
         coords_frame.pack(fill="x", pady=(10,0))
 
         # Colocamos: Label X | Entry X | Label Y | Entry Y en la misma fila
+        # Validación al teclear: se rechaza cualquier tecla que no forme un número
+        validar_numero = (self.root.register(_es_numero_parcial), "%P")
+
         ttk.Label(coords_frame, text="Coordenada X Fóvea:").grid(row=0, column=0, sticky="w", pady=(10,0), padx=(0,20))
-        self.entry_fovea_x = ttk.Entry(coords_frame, width=10)
+        self.entry_fovea_x = ttk.Entry(coords_frame, textvariable=self.fovea_x, validate="key", validatecommand=validar_numero, width=10)
         self.entry_fovea_x.grid(row=1, column=0, sticky="w")
 
         ttk.Label(coords_frame, text="Coordenada Y Fóvea:").grid(row=0, column=1, sticky="w", pady=(10,0))
-        self.entry_fovea_y = ttk.Entry(coords_frame, width=10)
+        self.entry_fovea_y = ttk.Entry(coords_frame, textvariable=self.fovea_y, validate="key", validatecommand=validar_numero, width=10)
         self.entry_fovea_y.grid(row=1, column=1, sticky="w")
 
         ttk.Label(coords_frame, text="Ancho Imagen (px):").grid(row=2, column=0, sticky="w", pady=(10,0))
@@ -98,10 +188,12 @@ class AplicacionGUI:
         self.entry_alto_imagen.grid(row=3, column=1, sticky="w")
 
         # Botón para guardar
-        ttk.Button(form_frame, text="Guardar Imagen", command=self._evento_guardar_nueva_imagen).pack(fill="x", pady=10)
+        boton_guardar = ttk.Button(form_frame, text="Guardar Imagen", command=self._evento_guardar_nueva_imagen, state="disabled")
+        boton_guardar.pack(fill="x", pady=10)
         
 
         # -- Previsualización de la Imagen --
+        ttk.Button(form_frame, text="Previsualizar", command=self._evento_previsualizar).pack(fill="x")
         self.label_preview = ttk.Label(form_frame, text="Previsualización", relief="solid", anchor="center")
         self.label_preview.pack(fill="both", expand=True, pady=10)
 
@@ -110,9 +202,23 @@ class AplicacionGUI:
         tabla_frame = ttk.LabelFrame(main_frame, text="Imágenes Registradas", padding="10")
         tabla_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
         
-        # -- Tabla (TreeView) --
+        # -- Filtro de búsqueda --
+        filtro_frame = ttk.Frame(tabla_frame)
+        filtro_frame.pack(fill="x", pady=(0,5))
+        ttk.Label(filtro_frame, text="Buscar:").pack(side=tk.LEFT)
+        entry_filtro = ttk.Entry(filtro_frame, textvariable=self.filtro_texto, state="disabled")
+        entry_filtro.pack(side=tk.LEFT, fill="x", expand=True, padx=(5,0))
+        self.filtro_texto.trace_add("write", lambda *_: self.refrescar_tabla_imagenes(reiniciar_paginacion=True))
+
+        # -- Tabla (TreeView) con barra de desplazamiento --
+        arbol_frame = ttk.Frame(tabla_frame)
+        arbol_frame.pack(fill=tk.BOTH, expand=True)
+
         columnas = ("id_imagen", "id_paciente", "diagnostico", "fecha_adquisicion", "conjunto_datos", "coordenadas_fovea", "dimensiones", "ruta_archivo")
-        self.tree = ttk.Treeview(tabla_frame, columns=columnas, show="headings")
+        self.tree = ttk.Treeview(arbol_frame, columns=columnas, show="headings")
+        self.scrollbar_tabla = ttk.Scrollbar(arbol_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        # Al desplazarse cerca del final se cargan más filas (ver `_evento_desplazar_tabla`).
+        self.tree.configure(yscrollcommand=self._evento_desplazar_tabla)
         
         # Definir cabeceras
         self.tree.heading("id_imagen", text="ID Imagen")
@@ -134,7 +240,8 @@ class AplicacionGUI:
         self.tree.column("dimensiones", width=100)
         self.tree.column("ruta_archivo", width=250)
         
-        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.scrollbar_tabla.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         # Cargar datos en el formulario al hacer click (selección) en la tabla
         self.tree.bind("<<TreeviewSelect>>", self._cargar_registro_seleccionado)
@@ -146,32 +253,86 @@ class AplicacionGUI:
         center_frame.pack(anchor="center")
         
         # Botón para modificar
-        ttk.Button(center_frame, text="Modificar Selección", command=self._evento_modificar_seleccion).pack(side=tk.LEFT, padx=5)
+        boton_modificar = ttk.Button(center_frame, text="Modificar Selección", command=self._evento_modificar_seleccion, state="disabled")
+        boton_modificar.pack(side=tk.LEFT, padx=5)
 
         # Botón para eliminar
-        ttk.Button(center_frame, text="Eliminar Selección", command=self._evento_eliminar_seleccion).pack(side=tk.LEFT, padx=5)
+        boton_eliminar = ttk.Button(center_frame, text="Eliminar Selección", command=self._evento_eliminar_seleccion, state="disabled")
+        boton_eliminar.pack(side=tk.LEFT, padx=5)
 
-    def refrescar_tabla_imagenes(self):
-        """Limpia y vuelve a cargar todos los datos en la tabla (TreeView)."""
-        # Borrar todos los items existentes
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Obtener la lista actualizada de objetos Imagen
+        # Botón para exportar la metadata a CSV
+        boton_exportar = ttk.Button(center_frame, text="Exportar CSV", command=self._evento_exportar_csv, state="disabled")
+        boton_exportar.pack(side=tk.LEFT, padx=5)
+
+        # Se habilitan en `_esperar_carga_inicial` cuando la metadata ya está en memoria.
+        self._widgets_con_datos.extend([boton_guardar, entry_filtro, boton_modificar, boton_eliminar, boton_exportar])
+
+    def refrescar_tabla_imagenes(self, reiniciar_paginacion=False):
+        """
+        Sincroniza la tabla (TreeView) con las imágenes del gestor.
+
+        Solo se muestran las imágenes que cumplen el filtro de búsqueda, y de
+        ellas solo las primeras páginas: el resto se carga al desplazarse. En
+        lugar de vaciar y volver a llenar la tabla, compara lo que se muestra
+        con los datos actuales (usando el ID de la imagen como identificador de
+        fila) y solo inserta, actualiza o elimina las filas que cambiaron.
+
+        Args:
+            reiniciar_paginacion (bool): Si es True, vuelve a mostrar solo la
+                                         primera página (p. ej. al cambiar el filtro).
+        """
+        # Obtener la lista actualizada de objetos Imagen y aplicar el filtro
         imagenes = self.gestor.obtener_imagenes_como_objetos()
-        
-        # Insertar cada imagen en la tabla
-        for img in imagenes:
-            self.tree.insert("", tk.END, values=(
-                img.id_imagen,
-                str(img.id_paciente),
-                img.diagnostico,
-                img.fecha_adquisicion.isoformat(),
-                img.conjunto_datos,
-                f"({img.coordenadas_fovea[0]}, {img.coordenadas_fovea[1]})" if img.coordenadas_fovea else "N/A",
-                f"({img.dimensiones[0]}x{img.dimensiones[1]})" if img.dimensiones else "N/A",
-                img.ruta_archivo
-            ))
+        texto = self.filtro_texto.get().strip().lower()
+        filas = ((img.id_imagen, img.fila_tabla) for img in imagenes)
+        if texto:
+            filas = (fila for fila in filas if any(texto in str(valor).lower() for valor in fila[1]))
+        self._filas_filtradas = list(filas)
+
+        # Mantener al menos tantas filas como las que ya estaban cargadas
+        cantidad = config.TAMANO_PAGINA_TABLA
+        if not reiniciar_paginacion:
+            cantidad = max(cantidad, len(self._filas_tabla))
+        visibles = dict(self._filas_filtradas[:cantidad])
+
+        # Eliminar, en una sola llamada, las filas que ya no deben mostrarse
+        eliminadas = self._filas_tabla.keys() - visibles.keys()
+        if eliminadas:
+            self.tree.delete(*eliminadas)
+
+        # Insertar las filas nuevas en su posición y actualizar solo las que cambiaron
+        llamar_tcl, widget = self.tree.tk.call, str(self.tree)
+        for posicion, (id_imagen, valores) in enumerate(visibles.items()):
+            valores_actuales = self._filas_tabla.get(id_imagen)
+            if valores_actuales is None:
+                llamar_tcl(widget, "insert", "", posicion, "-id", id_imagen, "-values", valores)
+            elif valores_actuales != valores:
+                self.tree.item(id_imagen, values=valores)
+
+        self._filas_tabla = visibles
+
+    def _cargar_pagina_siguiente(self):
+        """Añade al final de la tabla la siguiente página de filas filtradas."""
+        inicio = len(self._filas_tabla)
+        # Se invoca directamente el comando Tcl del Treeview: la tupla de valores
+        # se convierte en una lista Tcl sin pasar por el procesado de opciones
+        # que `ttk.Treeview.insert` hace en Python para cada fila.
+        llamar_tcl, widget = self.tree.tk.call, str(self.tree)
+        for id_imagen, valores in self._filas_filtradas[inicio:inicio + config.TAMANO_PAGINA_TABLA]:
+            llamar_tcl(widget, "insert", "", tk.END, "-id", id_imagen, "-values", valores)
+            self._filas_tabla[id_imagen] = valores
+
+    def _evento_desplazar_tabla(self, primero, ultimo):
+        """
+        Actualiza la barra de desplazamiento y carga más filas al acercarse al final.
+
+        Args:
+            primero (str): Fracción visible superior de la tabla (entre 0 y 1).
+            ultimo (str): Fracción visible inferior de la tabla (entre 0 y 1).
+        """
+        self.scrollbar_tabla.set(primero, ultimo)
+        if float(ultimo) > 0.9 and len(self._filas_tabla) < len(self._filas_filtradas):
+            self._cargar_pagina_siguiente()
 
     def _evento_seleccionar_archivo(self):
         """Abre un diálogo para seleccionar un archivo y muestra la previsualización."""
@@ -183,20 +344,79 @@ class AplicacionGUI:
             self.ruta_archivo_seleccionado.set(ruta)
             self._mostrar_preview(ruta)
 
+    def _evento_previsualizar(self):
+        """Muestra la previsualización del archivo cargado en el formulario."""
+        ruta = self.ruta_archivo_seleccionado.get()
+        if not ruta:
+            messagebox.showwarning("Sin Archivo", "Por favor, seleccione un archivo o una imagen de la tabla.")
+            return
+        self._mostrar_preview(ruta)
+
+    def _leer_dimensiones(self, ruta_imagen):
+        """
+        Obtiene el ancho y alto de una imagen leyendo solo su cabecera.
+
+        `Image.open` es perezoso: identifica el formato y el tamaño sin
+        decodificar los píxeles.
+
+        Args:
+            ruta_imagen (str): La ruta del archivo de imagen.
+
+        Returns:
+            tuple: (ancho, alto) de la imagen, o (0, 0) si no se puede leer.
+        """
+        try:
+            with Image.open(ruta_imagen, formats=config.FORMATOS_IMAGEN) as img:
+                return img.size
+        except Exception as e:
+            print(f"No se pudieron leer las dimensiones de '{ruta_imagen}': {e}")
+            return 0, 0
+
     def _mostrar_preview(self, ruta_imagen):
         """
         Carga y muestra una imagen en el widget de previsualización.
+
+        La decodificación se hace en un hilo aparte para no congelar la
+        interfaz con imágenes grandes; el resultado se aplica desde el bucle
+        principal de Tkinter en `_esperar_preview`.
         
         Args:
             ruta_imagen (str): La ruta del archivo de imagen a mostrar.
         """
+        self._ruta_preview = ruta_imagen
+        futuro = self._pool_preview.submit(_decodificar_preview, ruta_imagen)
+        self.root.after(20, self._esperar_preview, ruta_imagen, futuro)
+
+    def _esperar_preview(self, ruta_imagen, futuro):
+        """
+        Muestra la previsualización cuando su decodificación termina.
+
+        Args:
+            ruta_imagen (str): La ruta de la imagen que se decodificó.
+            futuro (Future): La tarea de decodificación en curso.
+        """
+        if not futuro.done():
+            # Tkinter no es seguro entre hilos: consultamos desde el bucle principal.
+            self.root.after(20, self._esperar_preview, ruta_imagen, futuro)
+            return
+        if ruta_imagen != self._ruta_preview:
+            # Mientras se decodificaba se seleccionó otra imagen; se descarta.
+            return
         try:
-            img = Image.open(ruta_imagen)
-            # Obtenemos y guardamos las dimensiones de la imagen original
-            self.ancho_imagen.set(img.width)
-            self.alto_imagen.set(img.height)
-            img.thumbnail((250, 250)) # Redimensiona para que quepa en la GUI
-            self.photo_preview = ImageTk.PhotoImage(img)
+            img, ancho, alto = futuro.result()
+            # Guardamos las dimensiones de la imagen original
+            self.ancho_imagen.set(ancho)
+            self.alto_imagen.set(alto)
+            # Si la miniatura tiene el mismo tamaño que la anterior, se reutiliza
+            # la misma imagen de Tk pegando los nuevos píxeles en su buffer, en
+            # lugar de reservar una nueva y liberar la anterior.
+            if self.photo_preview is not None and (self.photo_preview.width(), self.photo_preview.height()) == img.size:
+                self.photo_preview.paste(img)
+            else:
+                # ImageTk se importa recién aquí, en la primera previsualización:
+                # así el arranque de la aplicación no carga su extensión de Tk.
+                from PIL import ImageTk
+                self.photo_preview = ImageTk.PhotoImage(img)
             self.label_preview.config(image=self.photo_preview)
         except Exception as e:
             self.label_preview.config(image=None, text=f"Error al cargar\nla imagen:\n{e}")
@@ -208,21 +428,29 @@ class AplicacionGUI:
         paciente_id = self.entry_paciente.get()
         diagnostico = self.combo_diagnostico.get()
         conjunto = self.combo_conjunto.get()
-        coordenadas_fovea = (self.entry_fovea_x.get(), self.entry_fovea_y.get())
         dimensiones = (self.ancho_imagen.get(), self.alto_imagen.get())
         
-        # 2. Validar que los campos no estén vacíos
-        if not all([ruta, paciente_id, diagnostico, conjunto, coordenadas_fovea[0], coordenadas_fovea[1]]):
+        # 2. Validar que los campos no estén vacíos (se detiene en el primero vacío)
+        if not (ruta and paciente_id and diagnostico and conjunto
+                and self.entry_fovea_x.get() and self.entry_fovea_y.get()):
             messagebox.showwarning("Campos Incompletos", "Por favor, complete todos los campos antes de guardar.")
             return
 
+        # Las entradas ya solo contienen números; falta descartar uno a medio
+        # escribir, como "-" o ".".
+        try:
+            coordenadas_fovea = (self.fovea_x.get(), self.fovea_y.get())
+        except tk.TclError:
+            messagebox.showwarning("Coordenadas Inválidas", "Las coordenadas de la fóvea deben ser números.")
+            return
+
         # 3. Crear el diccionario de metadata
         metadata = {
             "id_paciente": paciente_id,
             "diagnostico": diagnostico,
             "conjunto_datos": conjunto,
             "fecha_adquisicion": date.today(), # Usamos la fecha actual
-            "coordenadas_fovea": (float(coordenadas_fovea[0]), float(coordenadas_fovea[1])) if all(coordenadas_fovea) else None,
+            "coordenadas_fovea": coordenadas_fovea,
             "dimensiones": dimensiones
         }
 
@@ -263,9 +491,8 @@ class AplicacionGUI:
         if not confirmar:
             return
 
-        # Obtenemos el ID de la imagen de la fila seleccionada
-        item_seleccionado = self.tree.item(seleccion[0])
-        id_a_eliminar = item_seleccionado['values'][0]
+        # El identificador de la fila seleccionada es el ID de la imagen
+        id_a_eliminar = seleccion[0]
         
         # Llamamos al gestor
         self.gestor.eliminar_imagen_por_id(id_a_eliminar)
@@ -281,24 +508,29 @@ class AplicacionGUI:
             messagebox.showwarning("Sin Selección", "Por favor, seleccione una imagen de la tabla para modificar.")
             return
 
-        # Obtenemos el ID de la imagen de la fila seleccionada
-        item_seleccionado = self.tree.item(seleccion[0])
-        self.id_a_modificar = item_seleccionado['values'][0]
+        # El identificador de la fila seleccionada es el ID de la imagen
+        self.id_a_modificar = seleccion[0]
 
         # Indicamos que estamos en modo edición
         self.es_editar = True
         self._evento_guardar_nueva_imagen()
 
+    def _evento_exportar_csv(self):
+        """Le pide al gestor que exporte toda la metadata al archivo CSV."""
+        self.gestor.exportar_metadata_csv()
+        messagebox.showinfo("Éxito", f"Metadata exportada a '{config.RUTA_EXPORTACION_CSV}'.")
+
     def _limpiar_formulario(self):
         """Limpia todos los campos de entrada del formulario."""
         self.ruta_archivo_seleccionado.set("")
         self.entry_paciente.delete(0, tk.END)
         self.combo_diagnostico.set("No tiene Glaucoma")
         self.combo_conjunto.set("Train")
-        self.entry_fovea_x.delete(0, tk.END)
-        self.entry_fovea_y.delete(0, tk.END)
+        self.fovea_x.set("")
+        self.fovea_y.set("")
         self.ancho_imagen.set(0)
         self.alto_imagen.set(0)
+        self._ruta_preview = None
         self.label_preview.config(image=None, text="Previsualización")
 
     def _cargar_registro_seleccionado(self, event):
@@ -307,44 +539,35 @@ class AplicacionGUI:
         if not seleccion:
             return
         try:
-            item = self.tree.item(seleccion[0])
-            vals = item.get("values", [])
-            if not vals:
+            # El identificador de la fila es el ID de la imagen: se toman los
+            # valores del objeto Imagen en lugar de volver a interpretar el
+            # texto formateado que muestra la tabla.
+            imagen = self.gestor.obtener_imagen_por_id(seleccion[0])
+            if imagen is None:
                 return
 
             # Rellenar campos del formulario (no activar es_editar ni id_a_modificar)
             self._limpiar_formulario()
-            self.ruta_archivo_seleccionado.set(vals[7])
-            self.entry_paciente.insert(0, str(vals[1]))
-            self.combo_diagnostico.set(vals[2])
-            self.combo_conjunto.set(vals[4])
-
-            coordenadas_fovea = vals[5]
-            if coordenadas_fovea and coordenadas_fovea != "N/A":
-                coords = coordenadas_fovea.strip("()").split(",")
-                # limpiar espacios
-                coords = [c.strip() for c in coords]
-                if len(coords) >= 2:
-                    self.entry_fovea_x.insert(0, coords[0])
-                    self.entry_fovea_y.insert(0, coords[1])
-
-            dimension = vals[6]
-            if dimension and dimension != "N/A":
-                dims = dimension.strip("()").split("x")
-                if len(dims) == 2:
-                    try:
-                        self.ancho_imagen.set(int(dims[0]))
-                        self.alto_imagen.set(int(dims[1]))
-                    except ValueError:
-                        self.ancho_imagen.set(0)
-                        self.alto_imagen.set(0)
+            self.ruta_archivo_seleccionado.set(imagen.ruta_archivo)
+            self.entry_paciente.insert(0, imagen.id_paciente)
+            self.combo_diagnostico.set(imagen.diagnostico)
+            self.combo_conjunto.set(imagen.conjunto_datos)
+
+            if imagen.coordenadas_fovea:
+                fovea_x, fovea_y = imagen.coordenadas_fovea
+                self.fovea_x.set(fovea_x)
+                self.fovea_y.set(fovea_y)
+
+            if imagen.dimensiones:
+                ancho, alto = imagen.dimensiones
             else:
-                self.ancho_imagen.set(0)
-                self.alto_imagen.set(0)
-
-            # Mostrar preview si existe ruta
-            ruta = self.ruta_archivo_seleccionado.get()
-            if ruta:
-                self._mostrar_preview(ruta)
+                # Sin dimensiones registradas: se leen de la cabecera del archivo,
+                # sin decodificar la imagen.
+                ancho, alto = self._leer_dimensiones(imagen.ruta_archivo)
+            self.ancho_imagen.set(ancho)
+            self.alto_imagen.set(alto)
+
+            # La previsualización no se genera al recorrer la tabla: se pide con
+            # el botón "Previsualizar", para que seleccionar una fila sea inmediato.
         except Exception as e:
             print(f"Error cargando selección en formulario: {e}")
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Pruebas del GestorImagenes sobre archivos compartidos entre registros.
+
+Cada prueba usa un dataset y una base de datos temporales, de modo que no
+toca las carpetas reales del proyecto.
+
+Ejecución (desde la raíz del proyecto):
+    python -m unittest
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
+import config
+import utils
+from models.gestor import GestorImagenes
+
+
+class TestArchivosCompartidos(unittest.TestCase):
+
+    def setUp(self):
+        temporal = tempfile.TemporaryDirectory()
+        self.addCleanup(temporal.cleanup)
+        self.base = Path(temporal.name)
+
+        ruta_data = self.base / "metadata"
+        ruta_dataset = self.base / "images" / "dataset"
+        valores = {
+            "RUTA_DATA": ruta_data,
+            "RUTA_DATASET": ruta_dataset,
+            "RUTAS_CONJUNTOS": {c: ruta_dataset / c for c in config.CARPETAS_DATASET},
+            "RUTA_METADATA_CSV": ruta_data / config.NOMBRE_METADATA_CSV,
+            "RUTA_EXPORTACION_CSV": ruta_data / config.NOMBRE_EXPORTACION_CSV,
+            "RUTA_METADATA_DB": ruta_data / config.NOMBRE_METADATA_DB,
+        }
+        for nombre, valor in valores.items():
+            parche = mock.patch.object(config, nombre, valor)
+            parche.start()
+            self.addCleanup(parche.stop)
+        # La raíz del dataset se resuelve al importar `utils`.
+        parche = mock.patch.object(utils, "_RAIZ_DATASET", os.path.realpath(ruta_dataset))
+        parche.start()
+        self.addCleanup(parche.stop)
+
+        self.gestor = GestorImagenes()
+
+    def _registrar(self, carpeta, nombre, contenido, conjunto="Train"):
+        """Crea un archivo de origen, lo registra y retorna el objeto Imagen creado."""
+        origen = self.base / carpeta / nombre
+        origen.parent.mkdir(parents=True, exist_ok=True)
+        origen.write_bytes(contenido)
+        metadata = {
+            "id_paciente": "p1",
+            "diagnostico": "Tiene Glaucoma",
+            "conjunto_datos": conjunto,
+            "fecha_adquisicion": date(2024, 1, 2),
+            "coordenadas_fovea": (1.5, 2.0),
+            "dimensiones": (10, 20),
+        }
+        self.assertTrue(self.gestor.registrar_nueva_imagen(str(origen), metadata))
+        return self.gestor.obtener_imagenes_como_objetos()[-1]
+
+    def _rutas_indexadas(self):
+        """Retorna las rutas que tienen una fila en la tabla de hashes."""
+        with sqlite3.connect(config.RUTA_METADATA_DB) as conexion:
+            return {ruta for (ruta,) in conexion.execute("SELECT ruta_archivo FROM hashes_contenido")}
+
+    def test_contenido_repetido_reutiliza_archivo(self):
+        imagen_a = self._registrar("origen", "a.png", b"XXXX")
+        imagen_b = self._registrar("origen", "b.png", b"XXXX")
+
+        self.assertEqual(imagen_a.ruta_archivo, imagen_b.ruta_archivo)
+        self.assertFalse((config.RUTAS_CONJUNTOS["Train"] / "b.png").exists())
+        self.assertEqual(self._rutas_indexadas(), {imagen_a.ruta_archivo})
+
+    def test_contenido_repetido_en_otro_conjunto(self):
+        imagen_train = self._registrar("origen", "a.png", b"XXXX")
+        imagen_test = self._registrar("origen", "b.png", b"XXXX", conjunto="Test")
+        imagen_train_2 = self._registrar("origen", "c.png", b"XXXX")
+
+        self.assertIn("Test", imagen_test.ruta_archivo)
+        self.assertEqual(imagen_train_2.ruta_archivo, imagen_train.ruta_archivo)
+
+    def test_nombre_repetido_no_sobreescribe(self):
+        imagen_a = self._registrar("origen1", "a.png", b"XXXX")
+        imagen_b = self._registrar("origen1", "b.png", b"XXXX")
+        imagen_c = self._registrar("origen2", "a.png", b"YYYYYY")
+
+        self.assertNotEqual(imagen_c.ruta_archivo, imagen_a.ruta_archivo)
+        self.assertEqual(Path(imagen_a.ruta_archivo).read_bytes(), b"XXXX")
+        self.assertEqual(Path(imagen_b.ruta_archivo).read_bytes(), b"XXXX")
+        self.assertEqual(Path(imagen_c.ruta_archivo).read_bytes(), b"YYYYYY")
+
+    def test_mover_imagen_compartida_conserva_archivo(self):
+        imagen_a = self._registrar("origen", "a.png", b"XXXX")
+        imagen_b = self._registrar("origen", "b.png", b"XXXX")
+        ruta_compartida = imagen_b.ruta_archivo
+
+        datos = {"conjunto_datos": "Test", "ruta_archivo": imagen_a.ruta_archivo}
+        self.assertTrue(self.gestor.modificar_metadata_imagen(imagen_a.id_imagen, datos))
+
+        self.assertIn("Test", imagen_a.ruta_archivo)
+        self.assertEqual(Path(imagen_a.ruta_archivo).read_bytes(), b"XXXX")
+        self.assertEqual(imagen_b.ruta_archivo, ruta_compartida)
+        self.assertEqual(Path(ruta_compartida).read_bytes(), b"XXXX")
+
+    def test_mover_a_nombre_ocupado_no_sobreescribe(self):
+        imagen_train = self._registrar("origen1", "m.png", b"AAAA")
+        imagen_test = self._registrar("origen2", "m.png", b"BBBBBB", conjunto="Test")
+
+        datos = {"conjunto_datos": "Test", "ruta_archivo": imagen_train.ruta_archivo}
+        self.assertTrue(self.gestor.modificar_metadata_imagen(imagen_train.id_imagen, datos))
+
+        self.assertNotEqual(imagen_train.ruta_archivo, imagen_test.ruta_archivo)
+        self.assertEqual(Path(imagen_train.ruta_archivo).read_bytes(), b"AAAA")
+        self.assertEqual(Path(imagen_test.ruta_archivo).read_bytes(), b"BBBBBB")
+
+    def test_eliminar_ultimo_uso_borra_archivo_y_hash(self):
+        imagen_a = self._registrar("origen", "a.png", b"XXXX")
+        imagen_b = self._registrar("origen", "b.png", b"XXXX")
+        ruta = Path(imagen_a.ruta_archivo)
+
+        # Mientras otra imagen use el archivo, se conservan el archivo y su hash.
+        self.gestor.eliminar_imagen_por_id(imagen_a.id_imagen)
+        self.assertTrue(ruta.exists())
+        self.assertEqual(self._rutas_indexadas(), {str(ruta)})
+
+        self.gestor.eliminar_imagen_por_id(imagen_b.id_imagen)
+        self.assertFalse(ruta.exists())
+        self.assertEqual(self._rutas_indexadas(), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,12 +14,36 @@ Principios de Diseño Aplicados:
 """
 
 import csv
+import hashlib
+import io
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 import config
 
+# Raíz real del dataset, resuelta una sola vez al importar el módulo.
+_RAIZ_DATASET = os.path.realpath(config.RUTA_DATASET)
+
+def _indicar_lectura_secuencial(archivo):
+    """
+    Indica al kernel que un archivo abierto se leerá de forma secuencial.
+
+    Permite que el sistema operativo adelante la lectura (readahead) de forma
+    más agresiva. Solo tiene efecto en sistemas POSIX; en el resto no hace nada.
+
+    Args:
+        archivo: Un objeto de archivo abierto (con método `fileno`).
+    """
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(archivo.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            # Es solo una sugerencia: si el sistema de archivos no la admite, se ignora.
+            pass
+
+
 def gestionar_rutas(ruta_base: Path, subcarpetas: List[Path]):
     """
     Crea un directorio base y una lista de subdirectorios si no existen.
@@ -36,7 +60,6 @@ def gestionar_rutas(ruta_base: Path, subcarpetas: List[Path]):
 
         # Itera sobre la lista de subcarpetas y las crea.
         for carpeta in subcarpetas:
-            print(carpeta)
             carpeta.mkdir(exist_ok=True, parents=True)
         print(f"Estructura de directorios verificada/creada en: {ruta_base}")
 
@@ -45,71 +68,226 @@ def gestionar_rutas(ruta_base: Path, subcarpetas: List[Path]):
         print(f"Error al crear la estructura de directorios: {e}")
 
 
-def escribir_csv(ruta_archivo: Path, datos: List[Dict], cabeceras: List[str]):
+def _reemplazar_archivo(ruta_archivo: Path, contenido: str):
     """
-    Escribe (o sobreescribe) una lista de diccionarios en un archivo CSV.
+    Escribe un contenido de texto en un archivo reemplazándolo de forma atómica.
 
-    Utiliza DictWriter para un manejo robusto de los datos basado en las
-    cabeceras.
+    El contenido se vuelca con una única escritura a un archivo temporal junto
+    al original, que luego lo reemplaza con `os.replace` (atómico en POSIX y en
+    Windows): si el proceso se interrumpe, el archivo anterior queda intacto.
+
+    Args:
+        ruta_archivo (Path): La ruta del archivo a escribir.
+        contenido (str): El texto completo del archivo.
+    """
+    ruta_temporal = ruta_archivo.with_suffix(ruta_archivo.suffix + ".tmp")
+    with open(ruta_temporal, mode='w', newline='', encoding='utf-8') as archivo:
+        archivo.write(contenido)
+    os.replace(ruta_temporal, ruta_archivo)
+
+
+def escribir_filas_csv(ruta_archivo: Path, filas: Iterable[Sequence], cabeceras: List[str]):
+    """
+    Escribe (o sobreescribe) un archivo CSV a partir de filas ya ordenadas.
+
+    Cada fila es una secuencia de valores en el mismo orden que las
+    cabeceras, por lo que no hace falta construir ni consultar un diccionario
+    por fila. Acepta cualquier iterable, incluido un generador.
+
+    El contenido se arma primero en memoria y se escribe de una sola vez,
+    reemplazando el archivo de forma atómica.
 
     Args:
         ruta_archivo (Path): La ruta completa del archivo CSV a escribir.
-        datos (List[Dict]): La lista de diccionarios que se escribirá.
+        filas (Iterable[Sequence]): Las filas de datos que se escribirán.
         cabeceras (List[str]): La lista de nombres de las columnas.
     """
-    try:
-        with open(ruta_archivo, mode='w', newline='', encoding='utf-8') as archivo_csv:
-            writer = csv.DictWriter(archivo_csv, fieldnames=cabeceras)
-            
-            # Escribe la fila de cabeceras.
-            writer.writeheader()
-            
-            # Escribe todas las filas de datos.
-            writer.writerows(datos)
+    buffer = io.StringIO(newline='')
+    writer = csv.writer(buffer)
+    writer.writerow(cabeceras)
+    writer.writerows(filas)
 
+    try:
+        _reemplazar_archivo(ruta_archivo, buffer.getvalue())
     except IOError as e:
         print(f"Error al escribir en el archivo CSV '{ruta_archivo}': {e}")
 
 
-def leer_csv(ruta_archivo: Path) -> List[Dict]:
+def iterar_filas_csv(ruta_archivo: Path) -> Iterator[List[str]]:
     """
-    Lee los datos de un archivo CSV y los devuelve como una lista de diccionarios.
+    Recorre un archivo CSV y produce cada fila como una lista de strings.
 
-    Si el archivo no existe, devuelve una lista vacía sin generar un error.
+    Evita construir un diccionario por fila. La primera lista producida es la
+    fila de cabeceras, que el consumidor puede usar para ubicar cada columna.
+    Si el archivo no existe, no produce ninguna fila.
 
     Args:
         ruta_archivo (Path): La ruta del archivo CSV a leer.
 
-    Returns:
-        List[Dict]: Una lista de diccionarios, donde cada diccionario
-                    representa una fila del CSV.
+    Yields:
+        List[str]: Los valores de cada fila del CSV, empezando por las cabeceras.
     """
     if not ruta_archivo.exists():
-        return []
+        return
 
     try:
-        with open(ruta_archivo, mode='r', newline='', encoding='utf-8') as archivo_csv:
-            # DictReader convierte cada fila en un diccionario.
-            reader = csv.DictReader(archivo_csv)
-            return list(reader)
+        with open(ruta_archivo, mode='r', newline='', encoding='utf-8',
+                  buffering=config.TAMANO_BUFFER_LECTURA) as archivo_csv:
+            _indicar_lectura_secuencial(archivo_csv)
+            yield from csv.reader(archivo_csv)
     except IOError as e:
         print(f"Error al leer el archivo CSV '{ruta_archivo}': {e}")
-        return []
+
+
+def _hash_archivo(ruta_archivo: Path) -> bytes:
+    """
+    Calcula un hash BLAKE2b de 128 bits del contenido de un archivo.
+
+    Args:
+        ruta_archivo (Path): Ruta del archivo a procesar.
+
+    Returns:
+        bytes: El digest calculado.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(ruta_archivo, mode='rb') as archivo:
+        _indicar_lectura_secuencial(archivo)
+        for bloque in iter(lambda: archivo.read(1 << 20), b""):
+            hasher.update(bloque)
+    return hasher.digest()
+
+
+def hash_contenido(ruta_archivo: Path) -> str:
+    """
+    Calcula la huella (hash BLAKE2b de 128 bits) del contenido de un archivo.
+
+    Dos archivos con la misma huella tienen, en la práctica, el mismo
+    contenido, aunque sus nombres sean distintos. BLAKE2b forma parte de la
+    biblioteca estándar y es más rápido que SHA-256.
+
+    Args:
+        ruta_archivo (Path): Ruta del archivo a procesar.
+
+    Returns:
+        str: El hash en formato hexadecimal.
+    """
+    return _hash_archivo(ruta_archivo).hex()
+
+
+def archivo_con_contenido(ruta_archivo: Path, hash_hex: str, tamano: int) -> bool:
+    """
+    Indica si un archivo tiene el contenido descrito por un hash y un tamaño.
+
+    Sirve para comparar un archivo con otro cuyo hash ya se calculó, sin volver
+    a leer este último. Primero compara el tamaño (una llamada a `stat`), y solo
+    si coincide lee el archivo para calcular su hash. La comparación es entre
+    huellas de 128 bits, no byte a byte, pero la probabilidad de que dos
+    contenidos distintos coincidan es despreciable.
+
+    Args:
+        ruta_archivo (Path): Ruta del archivo a comprobar.
+        hash_hex (str): Hash esperado, en el formato de `hash_contenido`.
+        tamano (int): Tamaño esperado, en bytes.
+
+    Returns:
+        bool: True si el archivo existe y coincide en tamaño y hash.
+    """
+    try:
+        if ruta_archivo.stat().st_size != tamano:
+            return False
+        return hash_contenido(ruta_archivo) == hash_hex
+    except OSError:
+        return False
+
+
+def _copiar_en_kernel(ruta_origen: Path, ruta_destino: Path) -> bool:
+    """
+    Intenta copiar un archivo con `os.copy_file_range` (Linux).
+
+    La copia ocurre por completo dentro del kernel; en sistemas de archivos
+    con copy-on-write (btrfs, XFS) puede resolverse como un "reflink", que no
+    mueve ningún byte y solo comparte los bloques entre ambos archivos.
+
+    Returns:
+        bool: True si la copia se completó; False si no está disponible o el
+              sistema de archivos no la admite (p. ej. entre dispositivos).
+    """
+    if not hasattr(os, "copy_file_range"):
+        return False
+    try:
+        # Abrir el destino lo trunca: si es el mismo archivo que el origen, se
+        # deja que `shutil.copyfile` reporte el error sin perder datos.
+        if ruta_destino.exists() and os.path.samefile(ruta_origen, ruta_destino):
+            return False
+        with open(ruta_origen, mode='rb') as origen, open(ruta_destino, mode='wb') as destino:
+            restante = os.fstat(origen.fileno()).st_size
+            while restante > 0:
+                copiados = os.copy_file_range(origen.fileno(), destino.fileno(), restante)
+                if copiados == 0:
+                    # Algunos sistemas de archivos devuelven 0 sin haber copiado
+                    # todo: la copia queda incompleta y se repite con `shutil`.
+                    return False
+                restante -= copiados
+        return True
+    except OSError:
+        return False
+
 
 def copiar_archivo(ruta_origen: Path, ruta_destino: Path):
     """
-    Copia un archivo desde una ruta de origen a una de destino.
+    Copia el contenido de un archivo desde una ruta de origen a una de destino.
+
+    En Linux intenta primero `os.copy_file_range`, que copia dentro del kernel
+    y en btrfs/XFS puede no mover ningún byte (reflink). Si no es posible,
+    usa `shutil.copyfile`, que también evita pasar los datos por Python
+    (`sendfile` en Linux, `fcopyfile` en macOS, donde APFS clona el archivo)
+    y, a diferencia de `shutil.copy`, no copia los permisos con un `chmod` extra.
 
     Args:
         ruta_origen (Path): Ruta del archivo a copiar.
         ruta_destino (Path): Ruta donde se guardará la copia.
+
+    Returns:
+        bool: True si la copia se realizó correctamente, False en caso contrario.
     """
 
     try:
-        shutil.copy(ruta_origen, ruta_destino)
+        if not _copiar_en_kernel(ruta_origen, ruta_destino):
+            shutil.copyfile(ruta_origen, ruta_destino)
         print(f"Archivo copiado de '{ruta_origen}' a '{ruta_destino}'")
+        return True
     except IOError as e:
         print(f"Error al copiar el archivo: {e}")
+        return False
+
+def copiar_archivos(pares: List[Tuple[Path, Path]], max_workers: Optional[int] = None) -> List[bool]:
+    """
+    Copia varios archivos en paralelo.
+
+    Las copias están limitadas por la E/S y no por el GIL, por lo que varios
+    hilos aprovechan mejor el ancho de banda del disco que una copia tras otra.
+    Pensada para importaciones masivas de imágenes.
+
+    Args:
+        pares (List[Tuple[Path, Path]]): Pares (ruta_origen, ruta_destino) a copiar.
+        max_workers (Optional[int]): Número de hilos; por defecto, el doble de
+                                     núcleos con un máximo de 8.
+
+    Returns:
+        List[bool]: El resultado de cada copia, en el mismo orden que `pares`.
+    """
+    if max_workers is None:
+        max_workers = min(8, (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda par: copiar_archivo(*par), pares))
+
+def _esta_en_dataset(ruta_real: str) -> bool:
+    """Indica si una ruta ya resuelta está dentro de la carpeta del dataset."""
+    try:
+        return os.path.commonpath((ruta_real, _RAIZ_DATASET)) == _RAIZ_DATASET
+    except ValueError:
+        # Rutas en unidades distintas (Windows) no comparten ningún prefijo.
+        return False
 
 def verificar_duplicados_dataset(ruta_origen: Path, ruta_destino: Path):
     """
@@ -124,25 +302,18 @@ def verificar_duplicados_dataset(ruta_origen: Path, ruta_destino: Path):
     """
     try:
         # Resolvemos rutas absolutas
-        ruta_origen_res = ruta_origen.resolve()
-        ruta_destino_res = ruta_destino.resolve()
-        dataset_root = config.RUTA_DATASET.resolve()
-
-        # Comprobamos si ambas rutas están dentro de la carpeta del dataset
-        moved_within_dataset = True
-        try:
-            ruta_origen_res.relative_to(dataset_root)
-            ruta_destino_res.relative_to(dataset_root)
-        except Exception:
-            moved_within_dataset = False
+        ruta_origen_res = os.path.realpath(ruta_origen)
+        ruta_destino_res = os.path.realpath(ruta_destino)
 
         # Si ambas están dentro del dataset y son diferentes, eliminar el original para evitar duplicados
-        if moved_within_dataset and ruta_origen_res != ruta_destino_res:
-            if ruta_origen_res.exists():
-                try:
-                    ruta_origen_res.unlink()
-                    print(f"Eliminado archivo original: {ruta_origen_res}")
-                except OSError as e:
-                    print(f"No se pudo eliminar el archivo original '{ruta_origen_res}': {e}")
+        if (ruta_origen_res != ruta_destino_res
+                and _esta_en_dataset(ruta_origen_res) and _esta_en_dataset(ruta_destino_res)):
+            try:
+                os.unlink(ruta_origen_res)
+                print(f"Eliminado archivo original: {ruta_origen_res}")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"No se pudo eliminar el archivo original '{ruta_origen_res}': {e}")
     except Exception as e:
         print(f"Error al verificar/limpiar duplicados en dataset: {e}")
\ No newline at end of file